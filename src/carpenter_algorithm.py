@@ -1,11 +1,32 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Set, FrozenSet, Tuple, Optional, Union
+import logging
 import os
+import numpy as np
 import pandas as pd
 
-from data_preprocessing import DataLoader
+from data_preprocessing import DataLoader, pack_tidsets
+
+
+logger = logging.getLogger(__name__)
+
+
+if hasattr(np, "bitwise_count"):
+    def _popcount_rows(words: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+else:  # NumPy < 2.0
+    _BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount_rows(words: np.ndarray) -> np.ndarray:
+        return _BYTE_POPCOUNT[words.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+# DFS extensions as parallel columns: item ids, projected tidsets
+# (one row of uint64 words per item) and supports
+_Extensions = Tuple[List[int], np.ndarray, List[int]]
 
 
 @dataclass(frozen=True)
@@ -16,14 +37,20 @@ class Pattern:
 
 class CARPENTER:
 
-    def __init__(self, minsup: Union[int, float] = 0.05, max_patterns: Optional[int] = None):
+    def __init__(self, minsup: Union[int, float] = 0.05, max_patterns: Optional[int] = None,
+                 n_jobs: int = 1):
         self.minsup = minsup
         self.max_patterns = max_patterns
+        # Worker processes for the top-level subtrees; 1 mines in-process
+        self.n_jobs = n_jobs
 
         self._n: int = 0
         self._minsup_count: int = 1
-        self._all_mask: int = 0
-        self._closed: Dict[FrozenSet[str], int] = {}
+        # Items behind each integer id used by the DFS
+        self._id_to_items: List[Tuple[str, ...]] = []
+        self._closed: Dict[FrozenSet[int], int] = {}
+        # Closed itemsets grouped by support; only equal-support sets can absorb each other
+        self._closed_by_sup: Dict[int, Set[FrozenSet[int]]] = {}
 
     def mine_patterns(self, transactions: List[Set[str]]) -> List[Pattern]:
         if not transactions:
@@ -31,94 +58,147 @@ class CARPENTER:
 
         self._n = len(transactions)
         self._minsup_count = self._normalize_minsup(self.minsup, self._n)
-        self._all_mask = (1 << self._n) - 1
         self._closed.clear()
-
-        # 1) Vertical DB: item -> bitmask of transaction IDs
-        vdb = self._build_vertical_db(transactions)
-
-        # 2) Keep frequent items
-        items: List[Tuple[str, int, int]] = []
-        for item, mask in vdb.items():
-            sup = mask.bit_count()
-            if sup >= self._minsup_count:
-                items.append((item, mask, sup))
-
-        # 3) Deterministic sort
-        items.sort(key=lambda x: (x[2], x[0]))
+        self._closed_by_sup.clear()
+
+        # 1) Vertical DB: item -> uint64 bitmap of transaction IDs
+        item_names, masks = self._build_vertical_db(transactions)
+
+        # 2) Keep frequent items, in deterministic order
+        supports = _popcount_rows(masks)
+        frequent = sorted(np.flatnonzero(supports >= self._minsup_count).tolist(),
+                          key=lambda i: (supports[i], item_names[i]))
+
+        # 3) Items with identical tidsets always occur together in a closed
+        #    itemset, so each such group becomes a single id for the DFS
+        group_of: Dict[bytes, int] = {}
+        groups: List[List[str]] = []
+        rows: List[int] = []
+        for i in frequent:
+            key = masks[i].tobytes()
+            gid = group_of.get(key)
+            if gid is None:
+                group_of[key] = len(groups)
+                groups.append([item_names[i]])
+                rows.append(i)
+            else:
+                groups[gid].append(item_names[i])
+        self._id_to_items = [tuple(g) for g in groups]
+        extensions = (list(range(len(rows))), masks[rows], supports[rows].tolist())
 
         # DFS from empty prefix
-        self._dfs(prefix=frozenset(), tidset=self._all_mask, extensions=items)
-
-        out = [Pattern(items=k, support=v) for k, v in self._closed.items()]
+        if self.n_jobs > 1:
+            self._dfs_parallel(extensions)
+        else:
+            self._dfs(prefix=(), support=self._n, extensions=extensions)
+
+        id_to_items = self._id_to_items
+        out = [Pattern(items=frozenset(it for i in k for it in id_to_items[i]), support=v)
+               for k, v in self._closed.items()]
         out.sort(key=lambda p: (-len(p.items), -p.support, sorted(p.items)))
         return out
 
-    def _dfs(self, prefix: FrozenSet[str], tidset: int, extensions: List[Tuple[str, int, int]]) -> None:
-        if self.max_patterns is not None and len(self._closed) >= self.max_patterns:
+    def _dfs(self, prefix: Tuple[int, ...], support: int, extensions: _Extensions) -> None:
+        if self._limit_reached():
             return
 
-        prefix_support = tidset.bit_count()
-
-        # Closure absorption
-        closure_items = set()
-        kept: List[Tuple[str, int, int]] = []
-
-        for (it, it_mask, _) in extensions:
-            proj = tidset & it_mask
-            proj_sup = proj.bit_count()
-            if proj_sup < self._minsup_count:
-                continue
-            if proj == tidset:
-                closure_items.add(it)
-            else:
-                kept.append((it, it_mask, proj_sup))
-
-        if closure_items:
-            prefix = frozenset(set(prefix) | closure_items)
-
+        prefix, kept = self._close(prefix, support, extensions)
         if prefix:
-            self._add_closed(prefix, prefix_support)
+            self._add_closed(frozenset(prefix), support)
 
         # Extend recursively
-        for idx, (it, it_mask, _) in enumerate(kept):
-            new_tid = tidset & it_mask
-            new_sup = new_tid.bit_count()
-            if new_sup < self._minsup_count:
-                continue
-
-            new_prefix = frozenset(set(prefix) | {it})
-
-            new_ext: List[Tuple[str, int, int]] = []
-            for (jt, jt_mask, _) in kept[idx + 1:]:
-                proj = new_tid & jt_mask
-                ps = proj.bit_count()
-                if ps >= self._minsup_count:
-                    new_ext.append((jt, jt_mask, ps))
+        for idx in range(len(kept[0])):
+            self._extend(prefix, kept, idx)
+            if self._limit_reached():
+                return
 
-            self._dfs(prefix=new_prefix, tidset=new_tid, extensions=new_ext)
+    def _close(self, prefix: Tuple[int, ...], support: int,
+               extensions: _Extensions) -> Tuple[Tuple[int, ...], _Extensions]:
+        # Each extension carries its tidset already projected onto the prefix
+        # tidset together with its support, so nothing is re-intersected here.
+        # The prefix support is passed down by the parent as well.
+        ids, masks, sups = extensions
+        minsup = self._minsup_count
+
+        # Closure absorption: a projected tidset is a subset of the prefix
+        # tidset, so equal support means equal tidsets
+        closure_items: List[int] = []
+        rows: List[int] = []
+        for j, sup in enumerate(sups):
+            if sup == support:
+                closure_items.append(ids[j])
+            elif sup >= minsup:
+                rows.append(j)
 
-            if self.max_patterns is not None and len(self._closed) >= self.max_patterns:
-                return
+        if closure_items:
+            prefix = prefix + tuple(closure_items)
+
+        # Ascending projected support keeps extension lists of deep branches short;
+        # the kept tidsets are gathered with a single fancy index
+        rows.sort(key=sups.__getitem__)
+        return prefix, ([ids[j] for j in rows], masks[rows], [sups[j] for j in rows])
+
+    def _extend(self, prefix: Tuple[int, ...], kept: _Extensions, idx: int) -> None:
+        # Mine the subtree of prefix + kept[idx], extended only by the items after it;
+        # all later tidsets are projected onto its tidset in one vectorized pass
+        ids, masks, sups = kept
+        if idx + 1 < len(ids):
+            proj = masks[idx + 1:] & masks[idx]
+            new_ext = (ids[idx + 1:], proj, _popcount_rows(proj).tolist())
+        else:
+            new_ext = ([], masks[:0], [])
+
+        self._dfs(prefix=prefix + (ids[idx],), support=sups[idx], extensions=new_ext)
+
+    def _dfs_parallel(self, extensions: _Extensions) -> None:
+        # The subtrees below the root are disjoint: mine each one in a worker
+        # process and merge the local results through _add_closed, in order.
+        prefix, kept = self._close((), self._n, extensions)
+        if prefix:
+            self._add_closed(frozenset(prefix), self._n)
+        if not kept[0]:
+            return
 
-    def _add_closed(self, itemset: FrozenSet[str], support: int) -> None:
+        executor = ProcessPoolExecutor(max_workers=self.n_jobs,
+                                       initializer=_init_subtree_worker,
+                                       initargs=(self, prefix, kept))
+        try:
+            for closed in executor.map(_mine_subtree, range(len(kept[0]))):
+                for itemset, support in closed.items():
+                    if self._limit_reached():
+                        return
+                    self._add_closed(itemset, support)
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def _limit_reached(self) -> bool:
+        return self.max_patterns is not None and len(self._closed) >= self.max_patterns
+
+    def _add_closed(self, itemset: FrozenSet[int], support: int) -> None:
         if itemset in self._closed:
             self._closed[itemset] = support
             return
 
+        bucket = self._closed_by_sup.setdefault(support, set())
+
+        # Only a strictly smaller set can be a proper subset, so compare sizes first
+        size = len(itemset)
         to_remove = []
-        for existing, ex_sup in self._closed.items():
-            if ex_sup != support:
-                continue
-            if existing.issubset(itemset):
-                to_remove.append(existing)
-            elif itemset.issubset(existing):
-                return  # not closed
+        for existing in bucket:
+            ex_size = len(existing)
+            if ex_size < size:
+                if existing.issubset(itemset):
+                    to_remove.append(existing)
+            elif ex_size > size:
+                if itemset.issubset(existing):
+                    return  # not closed
 
         for ex in to_remove:
             del self._closed[ex]
+            bucket.discard(ex)
 
         self._closed[itemset] = support
+        bucket.add(itemset)
 
     @staticmethod
     def _normalize_minsup(minsup: Union[int, float], n: int) -> int:
@@ -133,32 +213,56 @@ class CARPENTER:
         raise TypeError("minsup must be int or float.")
 
     @staticmethod
-    def _build_vertical_db(transactions: List[Set[str]]) -> Dict[str, int]:
-        vdb: Dict[str, int] = {}
+    def _build_vertical_db(transactions: List[Set[str]]) -> Tuple[List[str], np.ndarray]:
+        # One row of uint64 words per item; bit `tid` is set if the item occurs in transaction `tid`
+        item_ids: Dict[str, int] = {}
+        rows: List[int] = []
+        tids: List[int] = []
         for tid, t in enumerate(transactions):
-            bit = 1 << tid
             for item in t:
-                vdb[item] = vdb.get(item, 0) | bit
-        return vdb
+                rows.append(item_ids.setdefault(item, len(item_ids)))
+            tids.extend([tid] * len(t))
+
+        masks = pack_tidsets(np.array(rows, dtype=np.intp), np.array(tids, dtype=np.uint64),
+                             len(item_ids), len(transactions))
+        return list(item_ids), masks
+
+
+# Per-process state for CARPENTER._dfs_parallel workers
+_worker_miner: Optional[CARPENTER] = None
+_worker_root: Optional[Tuple[Tuple[int, ...], _Extensions]] = None
+
+
+def _init_subtree_worker(miner: CARPENTER, prefix: Tuple[int, ...], kept: _Extensions) -> None:
+    global _worker_miner, _worker_root
+    _worker_miner = miner
+    _worker_root = (prefix, kept)
+
+
+def _mine_subtree(idx: int) -> Dict[FrozenSet[int], int]:
+    miner = _worker_miner
+    prefix, kept = _worker_root
+    miner._closed = {}
+    miner._closed_by_sup = {}
+    miner._extend(prefix, kept, idx)
+    return miner._closed
 
 
 def save_patterns_csv(patterns: List[Pattern], out_path: str = "results/carpenter_patterns.csv") -> None:
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
 
-    rows = []
-    for p in patterns:
-        rows.append({
-            "items": ",".join(sorted(p.items)),
-            "support": p.support,
-            "length": len(p.items)
-        })
-
-    df = pd.DataFrame(rows)
+    # Build the frame column by column rather than from one dict per row
+    df = pd.DataFrame({
+        "items": [",".join(sorted(p.items)) for p in patterns],
+        "support": np.fromiter((p.support for p in patterns), dtype=np.int64, count=len(patterns)),
+        "length": np.fromiter((len(p.items) for p in patterns), dtype=np.int64, count=len(patterns)),
+    })
     df.to_csv(out_path, index=False)
-    print(f"Saved patterns to {out_path} ({len(df)} rows)")
+    logger.info("Saved patterns to %s (%d rows)", out_path, len(df))
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     print("CARPENTER Algorithm Module")
 
     #  preprocessing pipeline
@@ -1,6 +1,67 @@
+import logging
+import mmap
+import operator
+import os
+from array import array
+
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Set, Tuple
+import scipy.sparse as sp
+from collections.abc import Sequence
+from typing import Iterator, List, Dict, Set, FrozenSet, Tuple, Union
+
+
+logger = logging.getLogger(__name__)
+
+
+def pack_tidsets(rows: np.ndarray, tids: np.ndarray, num_rows: int, num_tids: int) -> np.ndarray:
+    # Bitset table with bit tids[k] set in row rows[k]: num_rows rows of
+    # ceil(num_tids / 64) uint64 words, 64 transactions per word.
+    # Every bit is set in one scattered OR
+    tids = np.asarray(tids, dtype=np.uint64)
+    table = np.zeros((num_rows, (num_tids + 63) // 64), dtype=np.uint64)
+    np.bitwise_or.at(table, (rows, (tids >> np.uint64(6)).astype(np.intp)),
+                     np.uint64(1) << (tids & np.uint64(63)))
+    return table
+
+
+class TransactionView(Sequence):
+    # Read-only sequence of transactions backed by a loader's CSR arrays.
+    # Nothing is decoded up front: every access builds a frozenset of that
+    # row's item names, O(row length), so index or iterate rather than
+    # re-reading the whole view. It keeps the arrays it was created from;
+    # later loads or preprocessing replace them and do not affect the view
+    
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, vocab: List[str]):
+        self._indptr = indptr
+        self._indices = indices
+        # Only ever appended to, so the ids in indices stay valid
+        self._vocab = vocab
+    
+    def __len__(self) -> int:
+        return len(self._indptr) - 1
+    
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        i = operator.index(i)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("transaction index out of range")
+        return self._decode(self._indptr[i], self._indptr[i + 1])
+    
+    def __iter__(self) -> Iterator[FrozenSet[str]]:
+        ptr = self._indptr.tolist()
+        for a, b in zip(ptr, ptr[1:]):
+            yield self._decode(a, b)
+    
+    def _decode(self, start: int, end: int) -> FrozenSet[str]:
+        vocab = self._vocab
+        return frozenset([vocab[i] for i in self._indices[start:end].tolist()])
+    
+    def __repr__(self) -> str:
+        return f"TransactionView({len(self)} transactions)"
 
 
 class DataLoader:
@@ -9,152 +70,397 @@ class DataLoader:
     def __init__(self, filepath: str = None):
         # Store file path
         self.filepath = filepath
-        # List to store all transactions
-        self.transactions = []
-        # Set to store unique items
-        self.items = set()
+        # Item vocabulary: id -> item and item -> id
+        self.vocab: List[str] = []
+        self.item_to_id: Dict[str, int] = {}
+        # All transactions in CSR form: transaction i holds the sorted
+        # item ids indices[indptr[i]:indptr[i+1]]
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int32)
+        # Cached by get_statistics, reset whenever the transactions change
+        self._stats = None
+        # Cached by _item_columns: sorted item names and id -> column map
+        self._columns = None
+        # Dense matrix kept by create_transaction_matrix(reuse_buffer=True)
+        self._mat_buf = None
         # Counter for total transactions
         self.num_transactions = 0
+    
+    @property
+    def transactions(self) -> TransactionView:
+        # Read-only view of the transactions as item sets; rows are decoded
+        # from the item ids on access (see TransactionView). Assign a new
+        # list of sets to replace them
+        return TransactionView(self.indptr, self.indices, self.vocab)
+    
+    @transactions.setter
+    def transactions(self, transactions: List[Set[str]]):
+        # Replace all transactions, encoding items to ids
+        indices = array('i')
+        lengths = array('q')
+        for t in transactions:
+            ids = self._encode(t)
+            indices.extend(ids)
+            lengths.append(len(ids))
+        self._set_rows(lengths, indices)
+    
+    def _encode(self, items) -> List[int]:
+        # Look up (or assign) the id of every item
+        item_to_id = self.item_to_id
+        ids = []
+        for item in items:
+            idx = item_to_id.get(item)
+            if idx is None:
+                idx = item_to_id[item] = len(self.vocab)
+                self.vocab.append(item)
+            ids.append(idx)
+        return ids
+    
+    def _encode_tokens(self, tokens: List[bytes], token_ids: Dict[bytes, int]) -> List[int]:
+        # Ids of raw tokens, decoding and encoding the ones not seen yet
+        ids = []
+        for token in tokens:
+            idx = token_ids.get(token)
+            if idx is None:
+                idx = token_ids[token] = self._encode((token.decode(),))[0]
+            ids.append(idx)
+        return ids
+    
+    def _set_rows(self, lengths, indices):
+        # Store transactions given their lengths and concatenated item ids
+        self.indptr, self.indices = self._csr_rows(lengths, indices)
+        self._stats = None
+    
+    def _csr_rows(self, lengths, indices) -> Tuple[np.ndarray, np.ndarray]:
+        # CSR row pointers and ids for the given rows. Ids are sorted and
+        # repeated ones dropped for all rows at once: (row, id) pairs are
+        # packed into one int64 key, sorted, and equal neighbours removed
+        lengths = np.asarray(lengths, dtype=np.int64)
+        width = max(len(self.vocab), 1)
+        keys = np.repeat(np.arange(len(lengths), dtype=np.int64) * width, lengths)
+        keys += np.asarray(indices, dtype=np.int64)
+        keys.sort()
+        if len(keys):
+            keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+        rows, ids = np.divmod(keys, width)
+        return np.searchsorted(rows, np.arange(len(lengths) + 1)), ids.astype(np.int32)
+    
+    def _take_rows(self, rows: np.ndarray):
+        # Keep only the given transactions, in the given order
+        starts = self.indptr[:-1][rows]
+        lengths = self.indptr[1:][rows] - starts
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        # Source position of every kept item id
+        positions = np.repeat(starts - indptr[:-1], lengths) + np.arange(indptr[-1])
+        self.indptr = indptr
+        self.indices = self.indices[positions]
+        self._stats = None
+    
+    def _num_rows(self) -> int:
+        return len(self.indptr) - 1
         
-    def load_dataset(self, filepath: str = None, delimiter: str = ' ') -> List[Set[str]]:
+    def load_dataset(self, filepath: str = None, delimiter: str = ' ') -> TransactionView:
         # Load transactions from file
         # Update filepath if provided
         if filepath:
             self.filepath = filepath
         
         try:
-            # Open and read file
-            with open(self.filepath, 'r') as f:
-                for line in f:
-                    line = line.strip()  # Remove whitespace
-                    if line:  # Skip empty lines
-                        # Split line into items and convert to set
-                        items = set(line.split(delimiter))
-                        self.transactions.append(items)
-                        # Add items to global item set
-                        self.items.update(items)
-                        
-            self.num_transactions = len(self.transactions)
-            print(f"Loaded {self.num_transactions} transactions with {len(self.items)} unique items")
+            # Item ids of all lines back to back, and the number per line,
+            # starting from the transactions already loaded
+            indices = array('i', self.indices.tobytes())
+            lengths = array('q', np.diff(self.indptr).tobytes())
+            
+            for ids in self._read_ids(delimiter):
+                indices.extend(ids)
+                lengths.append(len(ids))
+            
+            self._set_rows(lengths, indices)
+            self.num_transactions = self._num_rows()
+            logger.info("Loaded %d transactions with %d unique items",
+                        self.num_transactions, len(self.vocab))
             return self.transactions
             
         except FileNotFoundError:
-            print(f"Error: File not found at {self.filepath}")
+            logger.error("Error: File not found at %s", self.filepath)
             return []
         except Exception as e:
-            print(f"Error loading dataset: {str(e)}")
+            logger.error("Error loading dataset: %s", e)
             return []
     
+    def iter_chunks(self, filepath: str = None, chunk_size: int = 1_000_000,
+                    delimiter: str = ' ') -> Iterator[Tuple[sp.csr_matrix, List[str]]]:
+        # Stream the file as CSR blocks of up to chunk_size transactions, so
+        # only one block is in memory at a time. This loader is left as it
+        # is: the blocks are encoded with a vocabulary of their own, and each
+        # comes with its column names (column j is item items[j]; later
+        # blocks may have more columns as new items appear)
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1.")
+        return DataLoader(filepath or self.filepath)._chunks(chunk_size, delimiter)
+    
+    def _chunks(self, chunk_size: int, delimiter: str) -> Iterator[Tuple[sp.csr_matrix, List[str]]]:
+        # Generator behind iter_chunks, run on the streaming loader
+        indices = array('i')
+        lengths = array('q')
+        for ids in self._read_ids(delimiter):
+            indices.extend(ids)
+            lengths.append(len(ids))
+            if len(lengths) == chunk_size:
+                yield self._chunk_matrix(lengths, indices), self.vocab[:]
+                indices = array('i')
+                lengths = array('q')
+        if lengths:
+            yield self._chunk_matrix(lengths, indices), self.vocab[:]
+    
+    def _chunk_matrix(self, lengths, indices) -> sp.csr_matrix:
+        indptr, ids = self._csr_rows(lengths, indices)
+        data = np.ones(len(ids), dtype=np.uint8)
+        return sp.csr_matrix((data, ids, indptr), shape=(len(lengths), len(self.vocab)))
+    
+    def _read_ids(self, delimiter: str) -> Iterator[List[int]]:
+        # Yield the item ids of every non-empty line of self.filepath.
+        # The file is mapped and parsed as raw bytes; a token is decoded only
+        # the first time it is seen, later occurrences hit token_ids
+        sep = delimiter.encode()
+        token_ids: Dict[bytes, int] = {}
+        with open(self.filepath, 'rb') as f:
+            if not os.fstat(f.fileno()).st_size:  # mmap rejects empty files
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for line in iter(mm.readline, b''):
+                    line = line.strip()  # Remove whitespace
+                    if line:  # Skip empty lines
+                        # Split line into items; repeated items are
+                        # dropped when the rows are stored
+                        tokens = line.split(sep)
+                        try:
+                            ids = list(map(token_ids.__getitem__, tokens))
+                        except KeyError:
+                            ids = self._encode_tokens(tokens, token_ids)
+                        yield ids
+    
     def preprocess_data(self, remove_duplicates: bool = True, 
-                       min_transaction_length: int = 1) -> List[Set[str]]:
+                       min_transaction_length: int = 1) -> TransactionView:
         # Clean and filter transactions
-        if not self.transactions:
-            print("No transactions loaded.")
+        if not self._num_rows():
+            logger.warning("No transactions loaded.")
             return []
         
-        processed = self.transactions.copy()
-        original_count = len(processed)
+        original_count = self._num_rows()
+        rows = np.arange(original_count)
         
-        # Remove duplicate transactions
+        # Remove duplicate transactions: sorted id rows are equal
+        # exactly when their raw bytes are (first occurrence order is kept).
+        # Rows are sliced from one bytes copy of the ids, 4 bytes per id
         if remove_duplicates:
-            processed = [set(t) for t in set([frozenset(t) for t in processed])]
+            buf = self.indices.tobytes()
+            ptr = (self.indptr * self.indices.itemsize).tolist()
+            first = {}
+            for i, (a, b) in enumerate(zip(ptr, ptr[1:])):
+                first.setdefault(buf[a:b], i)
+            rows = np.fromiter(first.values(), dtype=np.int64, count=len(first))
             
         # Filter by minimum length
-        processed = [t for t in processed if len(t) >= min_transaction_length]
+        lengths = np.diff(self.indptr)[rows]
+        rows = rows[lengths >= min_transaction_length]
         
-        print(f"Preprocessing: {original_count} → {len(processed)} transactions")
-        self.transactions = processed
-        return processed
+        logger.info("Preprocessing: %d → %d transactions", original_count, len(rows))
+        # Kept rows stay in order, so keeping all of them changes nothing
+        if len(rows) < original_count:
+            self._take_rows(rows)
+        return self.transactions
     
-    def create_transaction_matrix(self) -> Tuple[np.ndarray, List[str], List[int]]:
+    def create_transaction_matrix(self, sparse: bool = False, reuse_buffer: bool = False
+                                  ) -> Tuple[Union[np.ndarray, sp.csr_matrix], List[str], List[int]]:
         # Convert transactions to binary matrix format
-        if not self.transactions:
-            print("No transactions to convert.")
+        # sparse=True returns a CSR matrix that only stores the present items
+        # reuse_buffer=True fills the dense matrix returned by the previous
+        # reuse_buffer call (when the shape matches) instead of allocating;
+        # that earlier matrix is overwritten, so only use it for throwaway results
+        if not self._num_rows():
+            logger.warning("No transactions to convert.")
             return np.array([]), [], []
         
-        # Sort items for consistent ordering
-        item_list = sorted(list(self.items))
-        # Map each item to a column index
-        item_to_idx = {item: idx for idx, item in enumerate(item_list)}
+        item_list, id_to_col = self._item_columns()
+        num_rows = self._num_rows()
         
-        # Create empty matrix (all zeros)
-        matrix = np.zeros((len(self.transactions), len(item_list)), dtype=int)
+        # Column of every present item, in CSR order
+        cols = id_to_col[self.indices]
         
-        # Fill matrix: 1 if item present in transaction, 0 otherwise
-        for trans_idx, transaction in enumerate(self.transactions):
-            for item in transaction:
-                item_idx = item_to_idx[item]
-                matrix[trans_idx][item_idx] = 1
+        if sparse:
+            # The stored row pointers already delimit each transaction's entries
+            data = np.ones(len(cols), dtype=np.uint8)
+            matrix = sp.csr_matrix((data, cols, self.indptr.copy()),
+                                   shape=(num_rows, len(item_list)))
+            matrix.sort_indices()
+        else:
+            # Create empty matrix (all zeros), one byte per cell for 0/1 data
+            shape = (num_rows, len(item_list))
+            if reuse_buffer and self._mat_buf is not None and self._mat_buf.shape == shape:
+                matrix = self._mat_buf
+                matrix.fill(0)
+            else:
+                matrix = np.zeros(shape, dtype=np.uint8)
+                if reuse_buffer:
+                    self._mat_buf = matrix
+            
+            # Fill matrix: 1 if item present in transaction, 0 otherwise,
+            # written for all (row, column) pairs in one step
+            rows = np.repeat(np.arange(num_rows), np.diff(self.indptr))
+            matrix[rows, cols] = 1
                 
-        transaction_ids = list(range(len(self.transactions)))
+        transaction_ids = list(range(num_rows))
         
-        print(f"Created transaction matrix: {matrix.shape[0]} × {matrix.shape[1]}")
+        logger.info("Created transaction matrix: %d × %d", *matrix.shape)
         return matrix, item_list, transaction_ids
     
-    def transpose_table(self, matrix: np.ndarray) -> np.ndarray:
+    def create_bitset_table(self) -> Tuple[np.ndarray, List[str]]:
+        # Item-major bitset table: row i has bit t set if item_list[i] is in
+        # transaction t, packed 64 transactions per uint64 word, so itemset
+        # support is a bitwise AND of rows followed by a popcount
+        if not self._num_rows():
+            logger.warning("No transactions to convert.")
+            return np.zeros((0, 0), dtype=np.uint64), []
+        
+        item_list, id_to_col = self._item_columns()
+        num_rows = self._num_rows()
+        
+        rows = id_to_col[self.indices]
+        tids = np.repeat(np.arange(num_rows), np.diff(self.indptr))
+        bitset = pack_tidsets(rows, tids, len(item_list), num_rows)
+        
+        logger.info("Created bitset table: %d items × %d transactions", bitset.shape[0], num_rows)
+        return bitset, item_list
+    
+    def _item_columns(self) -> Tuple[List[str], np.ndarray]:
+        # Sort items for consistent ordering; the vocabulary only grows,
+        # so the sort is redone only after new items were added
+        if self._columns is None or len(self._columns[0]) != len(self.vocab):
+            order = sorted(range(len(self.vocab)), key=self.vocab.__getitem__)
+            item_list = [self.vocab[i] for i in order]
+            # Map each item id to its column index
+            id_to_col = np.empty(len(order), dtype=np.int32)
+            id_to_col[order] = np.arange(len(order), dtype=np.int32)
+            self._columns = (item_list, id_to_col)
+        item_list, id_to_col = self._columns
+        return list(item_list), id_to_col
+    
+    def transpose_table(self, matrix: Union[np.ndarray, sp.csr_matrix]
+                        ) -> Union[np.ndarray, sp.csc_matrix]:
         # Transpose matrix from transaction-based to item-based view
         # Convert rows to columns and vice versa
+        # (a view for dense input; CSR input becomes CSC sharing the same
+        # buffers, so nothing is copied. Its columns are still transactions:
+        # for repeated per-item transaction lists, call .tocsr() on the
+        # result once, an O(nnz) conversion, and slice its rows)
         transposed = matrix.T
-        print(f"Transposed: {matrix.shape} → {transposed.shape}")
+        logger.info("Transposed: %s → %s", matrix.shape, transposed.shape)
         return transposed
     
     def get_statistics(self) -> Dict[str, any]:
         # Calculate dataset statistics
-        if not self.transactions:
+        if not self._num_rows():
             return {}
         
-        # Get length of each transaction
-        transaction_lengths = [len(t) for t in self.transactions]
-        
-        # Calculate various statistics
-        stats = {
-            'num_transactions': len(self.transactions),
-            'num_unique_items': len(self.items),
-            'avg_transaction_length': np.mean(transaction_lengths),
-            'min_transaction_length': np.min(transaction_lengths),
-            'max_transaction_length': np.max(transaction_lengths),
-            'total_items': sum(transaction_lengths),
-            'density': sum(transaction_lengths) / (len(self.transactions) * len(self.items))
-        }
+        # Statistics only change with the transactions, so they are computed
+        # from the row pointers once and cached until then
+        if self._stats is None:
+            transaction_lengths = np.diff(self.indptr)
+            total_items = int(self.indptr[-1])
+            self._stats = {
+                'num_transactions': self._num_rows(),
+                'num_unique_items': len(self.vocab),
+                'avg_transaction_length': transaction_lengths.mean(),
+                'min_transaction_length': transaction_lengths.min(),
+                'max_transaction_length': transaction_lengths.max(),
+                'total_items': total_items,
+                'density': total_items / (self._num_rows() * len(self.vocab))
+            }
+        stats = dict(self._stats)
         
         return stats
     
-    def print_statistics(self):
-        # Print dataset statistics
+    def print_statistics(self, file=None):
+        # Print dataset statistics (to sys.stdout unless another stream is given)
         stats = self.get_statistics()
         
-        print("DATASET STATISTICS")
-        print(f"Total Transactions:     {stats.get('num_transactions', 0)}")
-        print(f"Unique Items:           {stats.get('num_unique_items', 0)}")
-        print(f"Avg Transaction Length: {stats.get('avg_transaction_length', 0):.2f}")
-        print(f"Min Transaction Length: {stats.get('min_transaction_length', 0)}")
-        print(f"Max Transaction Length: {stats.get('max_transaction_length', 0)}")
-        print(f"Database Density:       {stats.get('density', 0):.4f}")
+        print("DATASET STATISTICS", file=file)
+        print(f"Total Transactions:     {stats.get('num_transactions', 0)}", file=file)
+        print(f"Unique Items:           {stats.get('num_unique_items', 0)}", file=file)
+        print(f"Avg Transaction Length: {stats.get('avg_transaction_length', 0):.2f}", file=file)
+        print(f"Min Transaction Length: {stats.get('min_transaction_length', 0)}", file=file)
+        print(f"Max Transaction Length: {stats.get('max_transaction_length', 0)}", file=file)
+        print(f"Database Density:       {stats.get('density', 0):.4f}", file=file)
+
+
+# create_sample_dataset shuffles whole item rows only up to this many
+# items, and at most _SAMPLE_CELLS row × item cells at a time
+_SHUFFLE_MAX_ITEMS = 1024
+_SAMPLE_CELLS = 1 << 22
+
+
+def _sample_rows(rng: np.random.Generator, num_rows: int, num_items: int,
+                 length: int) -> np.ndarray:
+    # num_rows rows of `length` distinct item indices each
+    if num_items > _SHUFFLE_MAX_ITEMS:
+        # Large vocabularies: a full shuffle per row would cost O(num_items).
+        # Draw items with replacement and redraw the rows that got a repeat,
+        # which are rare while length is small next to num_items
+        picks = rng.integers(num_items, size=(num_rows, length))
+        redo = np.arange(num_rows)
+        for _ in range(8):
+            ordered = np.sort(picks[redo], axis=1)
+            redo = redo[(ordered[:, 1:] == ordered[:, :-1]).any(axis=1)]
+            if not len(redo):
+                return picks
+            picks[redo] = rng.integers(num_items, size=(len(redo), length))
+        # Rows still repeating after that are drawn one by one
+        ordered = np.sort(picks[redo], axis=1)
+        for r in redo[(ordered[:, 1:] == ordered[:, :-1]).any(axis=1)].tolist():
+            picks[r] = rng.choice(num_items, length, replace=False)
+        return picks
+    
+    # Each row is a shuffled item order cut to its length, in bounded batches
+    picks = np.empty((num_rows, length), dtype=np.int64)
+    batch = max(1, _SAMPLE_CELLS // num_items)
+    for start in range(0, num_rows, batch):
+        n = min(batch, num_rows - start)
+        order = rng.permuted(np.broadcast_to(np.arange(num_items), (n, num_items)), axis=1)
+        picks[start:start + n] = order[:, :length]
+    return picks
 
 
 def create_sample_dataset(filename: str, num_transactions: int = 100, 
-                         num_items: int = 20, avg_length: int = 5):
-    # Create a sample dataset for testing
-    import random
+                         num_items: int = 20, avg_length: int = 5, seed: int = None):
+    # Create a sample dataset for testing (pass seed for a reproducible file)
+    rng = np.random.default_rng(seed)
     
     # Generate list of items
-    items = [f"item_{i}" for i in range(1, num_items + 1)]
+    items = np.array([f"item_{i}" for i in range(1, num_items + 1)])
+    
+    # Random length around average, for all transactions at once
+    lengths = rng.normal(avg_length, avg_length/3, num_transactions).astype(np.int64)
+    lengths = np.clip(lengths, 1, num_items)
+    
+    # Pick random items, in one batch per distinct length
+    lines = [''] * num_transactions
+    for length in np.unique(lengths).tolist():
+        rows = np.flatnonzero(lengths == length)
+        picks = _sample_rows(rng, len(rows), num_items, length)
+        for row, transaction in zip(rows.tolist(), items[picks].tolist()):
+            lines[row] = ' '.join(transaction)
     
     with open(filename, 'w') as f:
-        for _ in range(num_transactions):
-            # Random length around average
-            length = max(1, int(random.gauss(avg_length, avg_length/3)))
-            length = min(length, num_items)
-            
-            # Pick random items for this transaction
-            transaction = random.sample(items, length)
-            f.write(' '.join(transaction) + '\n')
+        f.write(''.join(line + '\n' for line in lines))
     
-    print(f"Created sample dataset: {filename}")
+    logger.info("Created sample dataset: %s", filename)
 
 
 # Test the module
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     print("Data Preprocessing Module")
     
     # Create sample datasets
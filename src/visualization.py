@@ -1,25 +1,101 @@
-import matplotlib.pyplot as plt
-import pandas as pd
-import numpy as np
+import heapq
 from typing import List, Set, Dict, Tuple
 
+import numpy as np
+
+# matplotlib is imported on first use, so importing this module stays cheap
+plt = None
+
+
+def _pyplot():
+    # pyplot (and its GUI backend) is only needed to show plots; saved
+    # plots are drawn on plain Figures
+    global plt
+    if plt is None:
+        import matplotlib.pyplot as plt
+    return plt
+
 
 class PatternVisualizer:
-    def __init__(self, figsize=(12, 6)):
+    def __init__(self, figsize=(12, 6), save_dpi: int = 100, tight_bbox: bool = False):
         self.figsize = figsize
-        
-    def plot_pattern_support(self, patterns: List[Dict], top_n: int = 15):
+        # Resolution and bbox of saved figures; pass save_dpi=300,
+        # tight_bbox=True for publication figures (tight_bbox renders twice)
+        self.save_dpi = save_dpi
+        self.tight_bbox = tight_bbox
+        # Pattern list passed to prepare() and its precomputed columns
+        self._prepared = None
+        # Figure reused by every plot that is saved rather than shown
+        self._save_fig = None
+        
+    def prepare(self, patterns: List[Dict]):
+        # Precompute pattern sizes, supports and the support ranking once,
+        # for several plots of the same list. Call again if the list changes.
+        columns = self._columns(patterns)
+        # Descending support; stable, so ties keep list order
+        columns['order'] = np.argsort(-columns['supports'], kind='stable')
+        self._prepared = (patterns, columns)
+        
+    @staticmethod
+    def _columns(patterns: List[Dict]) -> Dict:
+        # Pattern sizes and supports, one C-level fill per column instead of
+        # growing Python lists. Supports may be relative (fractions), so keep
+        # them as floats
+        return {
+            'sizes': np.fromiter((len(p.get('items', set())) for p in patterns),
+                                 dtype=np.int64, count=len(patterns)),
+            'supports': np.fromiter((p.get('support', 0) for p in patterns),
+                                    dtype=np.float64, count=len(patterns)),
+        }
+        
+    def _prepared_columns(self, patterns: List[Dict]) -> Dict:
+        # Columns from prepare() if they belong to this very list and it has
+        # not grown or shrunk since, else None
+        if self._prepared is not None and self._prepared[0] is patterns:
+            columns = self._prepared[1]
+            if len(patterns) == len(columns['sizes']):
+                return columns
+        return None
+        
+    def _subplots(self, save_path: str = None, nrows: int = 1, ncols: int = 1, figsize=None):
+        # Figure and axes for one plot. Saved plots share one pyplot-free
+        # Figure that is cleared between plots instead of built anew
+        figsize = figsize or self.figsize
+        if not save_path:
+            return _pyplot().subplots(nrows, ncols, figsize=figsize, constrained_layout=True)
+        
+        from matplotlib.figure import Figure
+        fig = self._save_fig
+        if fig is None or tuple(fig.get_size_inches()) != tuple(figsize):
+            fig = self._save_fig = Figure(figsize=figsize, constrained_layout=True)
+        else:
+            fig.clear()
+        return fig, fig.subplots(nrows, ncols)
+        
+    def _finish(self, fig, save_path: str = None):
+        # Save the figure to save_path, or show it interactively
+        if not save_path:
+            _pyplot().show()
+        else:
+            fig.savefig(save_path, dpi=self.save_dpi,
+                        bbox_inches='tight' if self.tight_bbox else None)
+        
+    def plot_pattern_support(self, patterns: List[Dict], top_n: int = 15, save_path: str = None):
         if not patterns:
             print("No patterns to visualize")
             return
             
-        # Sort by support
-        sorted_patterns = sorted(patterns, key=lambda x: x.get('support', 0), reverse=True)[:top_n]
+        # Top patterns by support; a bounded heap instead of sorting them all
+        columns = self._prepared_columns(patterns)
+        if columns is not None:
+            sorted_patterns = [patterns[i] for i in columns['order'][:top_n].tolist()]
+        else:
+            sorted_patterns = heapq.nlargest(top_n, patterns, key=lambda x: x.get('support', 0))
         
         pattern_names = [str(p.get('items', set())) for p in sorted_patterns]
         supports = [p.get('support', 0) for p in sorted_patterns]
         
-        fig, ax = plt.subplots(figsize=self.figsize)
+        fig, ax = self._subplots(save_path)
         bars = ax.barh(range(len(pattern_names)), supports, color='steelblue')
         ax.set_yticks(range(len(pattern_names)))
         ax.set_yticklabels(pattern_names, fontsize=9)
@@ -27,35 +103,33 @@ class PatternVisualizer:
         ax.set_title(f'Top {top_n} Closed Frequent Patterns by Support', fontsize=12, fontweight='bold')
         ax.grid(axis='x', alpha=0.3)
         
-        plt.tight_layout()
-        plt.show()
+        self._finish(fig, save_path)
         
-    def plot_pattern_distribution(self, patterns: List[Dict]):
+    def plot_pattern_distribution(self, patterns: List[Dict], save_path: str = None):
         # Plot distribution of pattern sizes
         if not patterns:
             print("No patterns to visualize")
             return
             
-        pattern_sizes = [len(p.get('items', set())) for p in patterns]
-        supports = [p.get('support', 0) for p in patterns]
+        columns = self._prepared_columns(patterns) or self._columns(patterns)
+        pattern_sizes, supports = columns['sizes'], columns['supports']
         
-        fig, ax = plt.subplots(figsize=self.figsize)
+        fig, ax = self._subplots(save_path)
         scatter = ax.scatter(pattern_sizes, supports, alpha=0.6, s=100, c=pattern_sizes, cmap='viridis')
         ax.set_xlabel('Pattern Size (# of items)', fontsize=11)
         ax.set_ylabel('Support (# of transactions)', fontsize=11)
         ax.set_title('Closed Frequent Patterns: Size vs Support', fontsize=12, fontweight='bold')
         ax.grid(True, alpha=0.3)
-        plt.colorbar(scatter, ax=ax, label='Pattern Size')
+        fig.colorbar(scatter, ax=ax, label='Pattern Size')
         
-        plt.tight_layout()
-        plt.show()
+        self._finish(fig, save_path)
         
     def plot_transaction_matrix(self, matrix: np.ndarray, item_list: List[str], 
-                               sample_size: int = 10):
+                               sample_size: int = 10, save_path: str = None):
         # Visualize transaction matrix as heatmap
         sample_matrix = matrix[:sample_size, :min(15, len(item_list))]
         
-        fig, ax = plt.subplots(figsize=(12, 6))
+        fig, ax = self._subplots(save_path, figsize=(12, 6))
         im = ax.imshow(sample_matrix, cmap='Blues', aspect='auto')
         
         ax.set_xlabel('Items', fontsize=11)
@@ -66,17 +140,16 @@ class PatternVisualizer:
         ax.set_yticks(range(sample_size))
         ax.set_yticklabels([f'T{i+1}' for i in range(sample_size)], fontsize=9)
         
-        plt.colorbar(im, ax=ax, label='Present (1) / Absent (0)')
-        plt.tight_layout()
-        plt.show()
+        fig.colorbar(im, ax=ax, label='Present (1) / Absent (0)')
+        self._finish(fig, save_path)
         
-    def plot_algorithm_statistics(self, stats: Dict):
+    def plot_algorithm_statistics(self, stats: Dict, save_path: str = None):
         # Plot algorithm execution statistics
         if not stats:
             print("No statistics to visualize")
             return
             
-        fig, axes = plt.subplots(2, 2, figsize=self.figsize)
+        fig, axes = self._subplots(save_path, 2, 2)
         
         # Execution time
         if 'execution_time' in stats:
@@ -108,8 +181,7 @@ class PatternVisualizer:
                           bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.5))
             axes[1, 1].axis('off')
         
-        plt.tight_layout()
-        plt.show()
+        self._finish(fig, save_path)
 
 
 # Test the module
@@ -0,0 +1,88 @@
+import os
+import random
+import sys
+from itertools import combinations
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from carpenter_algorithm import CARPENTER, Pattern
+
+
+def random_transactions(rng, num_transactions, items, density=0.4, together=()):
+    # Random database over items; every group in `together` occurs as a whole or not at all
+    transactions = []
+    for _ in range(num_transactions):
+        t = {it for it in items if rng.random() < density}
+        for group in together:
+            if rng.random() < density:
+                t.update(group)
+        transactions.append(t)
+    return transactions
+
+
+def brute_force_closed(transactions, minsup):
+    # Every frequent itemset whose closure (the items common to all of its
+    # transactions) is itself, in the order mine_patterns has always used
+    universe = sorted(set().union(*transactions))
+    out = []
+    for size in range(1, len(universe) + 1):
+        for itemset in combinations(universe, size):
+            cover = [t for t in transactions if t.issuperset(itemset)]
+            if len(cover) < minsup:
+                continue
+            if set.intersection(*cover) == set(itemset):
+                out.append(Pattern(items=frozenset(itemset), support=len(cover)))
+    out.sort(key=lambda p: (-len(p.items), -p.support, sorted(p.items)))
+    return out
+
+
+def test_mine_patterns_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(60):
+        items = [f'i{k}' for k in range(rng.randint(1, 7))]
+        transactions = random_transactions(rng, rng.randint(1, 80), items,
+                                           density=rng.uniform(0.2, 0.8))
+        if not any(transactions):
+            continue
+        minsup = rng.randint(1, 4)
+        assert CARPENTER(minsup).mine_patterns(transactions) == \
+            brute_force_closed(transactions, minsup)
+
+
+def test_mine_patterns_groups_items_that_occur_together():
+    # Items with identical tidsets are collapsed into one DFS id and expanded again
+    rng = random.Random(1)
+    for _ in range(30):
+        items = [f'i{k}' for k in range(rng.randint(0, 4))]
+        together = [('a1', 'a2', 'a3'), ('b1', 'b2')][:rng.randint(1, 2)]
+        transactions = random_transactions(rng, rng.randint(1, 70), items,
+                                           density=rng.uniform(0.3, 0.8), together=together)
+        if not any(transactions):
+            continue
+        minsup = rng.randint(1, 3)
+        assert CARPENTER(minsup).mine_patterns(transactions) == \
+            brute_force_closed(transactions, minsup)
+
+
+def test_mine_patterns_across_word_boundaries():
+    # Tidsets longer than one uint64 word, plus an item that occurs everywhere
+    rng = random.Random(2)
+    for num_transactions in (63, 64, 65, 130):
+        transactions = random_transactions(rng, num_transactions, ['a', 'b', 'c', 'd', 'e'])
+        for t in transactions:
+            t.add('all')
+        assert CARPENTER(5).mine_patterns(transactions) == \
+            brute_force_closed(transactions, 5)
+
+
+def test_parallel_run_matches_sequential():
+    # Top-level subtrees mined in worker processes merge to the sequential result
+    rng = random.Random(3)
+    transactions = random_transactions(rng, 120, [f'i{k}' for k in range(10)],
+                                       density=0.5, together=[('a1', 'a2')])
+    for max_patterns in (None, 1, 7, 40):
+        sequential = CARPENTER(3, max_patterns=max_patterns, n_jobs=1).mine_patterns(transactions)
+        parallel = CARPENTER(3, max_patterns=max_patterns, n_jobs=2).mine_patterns(transactions)
+        assert parallel == sequential
+        if max_patterns is not None:
+            assert len(sequential) == max_patterns
@@ -0,0 +1,53 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from data_preprocessing import DataLoader
+
+
+def write_lines(path, lines):
+    path.write_text(''.join(line + '\n' for line in lines))
+    return str(path)
+
+
+def test_iter_chunks_leaves_loader_unchanged(tmp_path):
+    loaded = write_lines(tmp_path / 'loaded.txt', ['a b', 'b c'])
+    streamed = write_lines(tmp_path / 'streamed.txt', ['w x', 'y z', 'w z'])
+
+    loader = DataLoader()
+    loader.load_dataset(loaded)
+    matrix, item_list, _ = loader.create_transaction_matrix()
+    bitset, bitset_items = loader.create_bitset_table()
+    stats = loader.get_statistics()
+
+    chunks = list(loader.iter_chunks(streamed, chunk_size=2))
+
+    # The blocks carry their own vocabulary
+    assert [c.shape for c, _ in chunks] == [(2, 4), (1, 4)]
+    assert chunks[-1][1] == ['w', 'x', 'y', 'z']
+    assert chunks[-1][0].toarray().tolist() == [[1, 0, 0, 1]]
+
+    # The loader's matrix, bitset table and statistics are unchanged
+    matrix_after, item_list_after, _ = loader.create_transaction_matrix()
+    bitset_after, bitset_items_after = loader.create_bitset_table()
+    assert item_list_after == item_list == ['a', 'b', 'c']
+    assert np.array_equal(matrix_after, matrix)
+    assert bitset_items_after == bitset_items
+    assert np.array_equal(bitset_after, bitset)
+    assert loader.get_statistics() == stats
+    assert stats['num_unique_items'] == 3
+    assert loader.filepath == loaded
+
+
+def test_iter_chunks_rejects_empty_chunks(tmp_path):
+    path = write_lines(tmp_path / 'streamed.txt', ['a b'])
+    for chunk_size in (0, -1):
+        try:
+            DataLoader().iter_chunks(path, chunk_size=chunk_size)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"chunk_size={chunk_size} was accepted")